@@ -0,0 +1,85 @@
+"""
+Crowd data for instanced pedestrians.
+
+Instead of baking a humanoid mesh per person into the world, the crowd is
+exported as:
+- one humanoid prototype per clothing palette (with per-vertex limb ids)
+- sidewalk paths along the road grid
+- a flat per-agent float array the viewer animates with instancing and a
+  vertex-shader walk cycle
+"""
+import math
+import random
+
+import shapes
+
+# Per-agent fields, in order, in the flat "agents" array
+AGENT_FIELDS = ["x", "z", "heading", "palette", "phase", "path", "distance", "speed"]
+AGENT_STRIDE = len(AGENT_FIELDS)
+
+SIDEWALK_OFFSET = 3.5  # Roads are 6 wide, walk just past the edge
+
+def _round(values, digits=3):
+    return [round(v, digits) for v in values]
+
+def build_paths(road_positions, city_size):
+    """Straight sidewalk paths [x0, z0, x1, z1] on both sides of every road"""
+    half = city_size / 2
+    paths = []
+    for z in road_positions:
+        for side in [-1, 1]:
+            walk_z = z + side * SIDEWALK_OFFSET
+            paths.append([-half, walk_z, half, walk_z])
+    return paths
+
+def build_prototypes():
+    prototypes = []
+    for palette in range(len(shapes.HUMAN_PALETTES)):
+        mesh = shapes.generate_humanoid_prototype(palette)
+        prototypes.append({
+            "vertices": [_round(v) for v in mesh.vertices],
+            "faces": mesh.faces,
+            "colors": mesh.colors,
+            "limbs": mesh.limbs
+        })
+    return prototypes
+
+def build_crowd(num_agents, road_positions, city_size):
+    """Scatter `num_agents` walkers over the sidewalks.
+
+    Each agent walks along one path; a negative speed walks it backwards.
+    Position and heading are the agent's state at time 0.
+    """
+    paths = build_paths(road_positions, city_size)
+    num_palettes = len(shapes.HUMAN_PALETTES)
+
+    agents = []
+    for _ in range(num_agents):
+        path_index = random.randrange(len(paths))
+        x0, z0, x1, z1 = paths[path_index]
+        length = math.hypot(x1 - x0, z1 - z0)
+        distance = random.uniform(0, length)
+        speed = random.uniform(1.0, 1.6) * random.choice([-1, 1])
+
+        t = distance / length
+        # Stagger agents sideways so they don't walk in single file
+        lateral = random.uniform(-0.6, 0.6)
+        x = x0 + (x1 - x0) * t
+        z = z0 + (z1 - z0) * t + lateral
+        heading = math.atan2(x1 - x0, z1 - z0)
+        if speed < 0:
+            heading += math.pi
+
+        agents.extend(_round([
+            x, z, heading,
+            random.randrange(num_palettes),
+            random.uniform(0, math.pi * 2),
+            path_index, distance, speed
+        ]))
+
+    return {
+        "prototypes": build_prototypes(),
+        "paths": paths,
+        "agent_fields": AGENT_FIELDS,
+        "agents": agents
+    }
@@ -1,5 +1,7 @@
+import argparse
 import json
 import os
+import profiling
 import shapes
 
 OUTPUT_DIR = "output"
@@ -10,21 +12,38 @@ def save_mesh(mesh, filename):
         json.dump(mesh.to_dict(), f) # Minified is fine
     print(f"Saved {filepath}")
 
-def main():
-    if not os.path.exists(OUTPUT_DIR):
-        os.makedirs(OUTPUT_DIR)
-
-    print("Generating PRO assets...")
-    
+def build():
     # Generate Crystal
     print("Generating Crystal...")
-    crystal = shapes.generate_crystal_cluster(seed=42)
-    save_mesh(crystal, "crystal.json")
+    with profiling.stage("crystal"):
+        crystal = shapes.generate_crystal_cluster(seed=42)
+    with profiling.stage("save_json"):
+        save_mesh(crystal, "crystal.json")
     
     # Generate Pro Tree
     print("Generating Tree...")
-    tree = shapes.generate_pro_tree(seed=123)
-    save_mesh(tree, "tree.json") # Overwrites old tree
+    with profiling.stage("tree"):
+        tree = shapes.generate_pro_tree(seed=123)
+    with profiling.stage("save_json"):
+        save_mesh(tree, "tree.json") # Overwrites old tree
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate standalone assets")
+    parser.add_argument("--profile", action="store_true",
+                        help="profile generators and stages, write reports to output/profile")
+    parser.add_argument("--profile-top", type=int, default=15,
+                        help="rows per table in the profile summary")
+    args = parser.parse_args()
+
+    if not os.path.exists(OUTPUT_DIR):
+        os.makedirs(OUTPUT_DIR)
+
+    print("Generating PRO assets...")
+    if args.profile:
+        with profiling.profile(os.path.join(OUTPUT_DIR, "profile"), "assets", top=args.profile_top):
+            build()
+    else:
+        build()
     
     print("Done!")
 
@@ -0,0 +1,230 @@
+"""
+Opt-in profiling for the generator pipeline.
+
+While a Profiler is active:
+- every `generate_*` function in shapes.py and `Mesh.add_mesh` is wrapped to
+  record calls, inclusive/self time and the triangles it produced
+- `stage(name)` blocks time the pipeline stages (roads, houses, JSON save...)
+- a background thread samples the main thread's Python stack and writes a
+  collapsed-stacks file that flamegraph.pl / speedscope / inferno can read
+
+Usage from an entry point:
+
+    with profiling.profile("output/profile", "world"):
+        ...
+
+When no profiler is active, `stage()` is a no-op and nothing is wrapped.
+"""
+import contextlib
+import functools
+import os
+import sys
+import threading
+import time
+
+import shapes
+
+_active = None
+
+
+class _Stat:
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.self_time = 0.0
+        self.triangles = 0
+        self.vertices = 0
+
+
+class Profiler:
+    def __init__(self, interval=0.001):
+        self.interval = interval
+        self.stats = {}
+        self.stages = {}
+        self.samples = {}
+        self._stage_stack = []
+        self._call_stack = []
+        self._patched = []
+        self._thread = None
+        self._running = False
+        self._target = None
+        self._old_switch = None
+        self._started = 0.0
+        self.elapsed = 0.0
+
+    # -------------------------------------------------------------------------
+    # Function wrapping
+    # -------------------------------------------------------------------------
+    def _wrap(self, name, fn, output):
+        stat = self.stats.setdefault(name, _Stat())
+        call_stack = self._call_stack
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            call_stack.append(0.0)
+            start = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                child = call_stack.pop()
+                if call_stack:
+                    call_stack[-1] += elapsed
+                stat.calls += 1
+                stat.total += elapsed
+                stat.self_time += elapsed - child
+            mesh = output(args, result)
+            if mesh is not None:
+                stat.triangles += len(mesh.faces)
+                stat.vertices += len(mesh.vertices)
+            return result
+        return wrapper
+
+    def _patch(self, owner, attr, name, output):
+        original = getattr(owner, attr)
+        self._patched.append((owner, attr, original))
+        setattr(owner, attr, self._wrap(name, original, output))
+
+    def wrap_generators(self):
+        for attr in sorted(vars(shapes)):
+            if attr.startswith("generate_") and callable(getattr(shapes, attr)):
+                self._patch(shapes, attr, attr, lambda args, result: result)
+        # add_mesh copies the other mesh, so count what it copied
+        self._patch(shapes.Mesh, "add_mesh", "Mesh.add_mesh", lambda args, result: args[1])
+
+    def unwrap_generators(self):
+        for owner, attr, original in reversed(self._patched):
+            setattr(owner, attr, original)
+        self._patched = []
+
+    # -------------------------------------------------------------------------
+    # Stages
+    # -------------------------------------------------------------------------
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Time a stage; nested stages are keyed by their path, e.g.
+        `generate_world/roads`, so parents and children don't look like
+        siblings."""
+        self._stage_stack.append(name)
+        path = "/".join(self._stage_stack)
+        # Register on entry so the summary lists parents before children
+        self.stages.setdefault(path, 0.0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[path] += time.perf_counter() - start
+            self._stage_stack.pop()
+
+    # -------------------------------------------------------------------------
+    # Stack sampling
+    # -------------------------------------------------------------------------
+    def _sample(self):
+        frame = sys._current_frames().get(self._target)
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            # Skip our own wrapper frames so stacks read generator -> generator
+            if code.co_filename == __file__:
+                frame = frame.f_back
+                continue
+            stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        stack.reverse()
+        key = ";".join([f"[{s}]" for s in self._stage_stack] + stack)
+        self.samples[key] = self.samples.get(key, 0) + 1
+
+    def _run_sampler(self):
+        while self._running:
+            time.sleep(self.interval)
+            self._sample()
+
+    def start(self):
+        self._target = threading.get_ident()
+        self._old_switch = sys.getswitchinterval()
+        # The sampler only gets the GIL at switch points; sample at our rate
+        sys.setswitchinterval(min(self._old_switch, self.interval))
+        self.wrap_generators()
+        self._running = True
+        self._thread = threading.Thread(target=self._run_sampler, daemon=True)
+        self._thread.start()
+        self._started = time.perf_counter()
+
+    def stop(self):
+        self.elapsed = time.perf_counter() - self._started
+        self._running = False
+        self._thread.join()
+        self.unwrap_generators()
+        sys.setswitchinterval(self._old_switch)
+
+    # -------------------------------------------------------------------------
+    # Output
+    # -------------------------------------------------------------------------
+    def write_collapsed(self, filepath):
+        with open(filepath, 'w') as f:
+            for stack, count in sorted(self.samples.items()):
+                f.write(f"{stack} {count}\n")
+
+    def summary(self, top=15):
+        lines = [f"Total: {self.elapsed:.3f}s, {sum(self.samples.values())} samples", ""]
+
+        lines.append("STAGES (nested stages are also counted in their parent)")
+        for path, seconds in self.stages.items():
+            lines.append(f"  {path:<40} {seconds:9.4f}s")
+        lines.append("")
+
+        lines.append(f"GENERATORS (top {top} by self time)")
+        lines.append(f"  {'function':<28} {'calls':>7} {'total s':>9} {'self s':>9} "
+                     f"{'triangles':>10} {'us/tri':>8}")
+        ranked = sorted(self.stats.items(), key=lambda kv: -kv[1].self_time)
+        for name, stat in ranked[:top]:
+            if not stat.calls:
+                continue
+            per_tri = stat.total / stat.triangles * 1e6 if stat.triangles else 0.0
+            lines.append(f"  {name:<28} {stat.calls:>7} {stat.total:>9.4f} {stat.self_time:>9.4f} "
+                         f"{stat.triangles:>10} {per_tri:>8.2f}")
+        lines.append("")
+
+        lines.append(f"HOT FRAMES (top {top} by samples)")
+        leaf_counts = {}
+        for stack, count in self.samples.items():
+            leaf = stack.rsplit(";", 1)[-1]
+            leaf_counts[leaf] = leaf_counts.get(leaf, 0) + count
+        for leaf, count in sorted(leaf_counts.items(), key=lambda kv: -kv[1])[:top]:
+            lines.append(f"  {count:>7}  {leaf}")
+        return "\n".join(lines) + "\n"
+
+    def write_report(self, out_dir, name, top=15):
+        os.makedirs(out_dir, exist_ok=True)
+        collapsed = os.path.join(out_dir, f"{name}.collapsed")
+        summary = os.path.join(out_dir, f"{name}_summary.txt")
+        self.write_collapsed(collapsed)
+        with open(summary, 'w') as f:
+            f.write(self.summary(top))
+        return collapsed, summary
+
+
+def stage(name):
+    """Time a pipeline stage if profiling is active, otherwise do nothing."""
+    if _active is None:
+        return contextlib.nullcontext()
+    return _active.stage(name)
+
+
+@contextlib.contextmanager
+def profile(out_dir, name, top=15, interval=0.001):
+    """Profile the enclosed block and write `<name>.collapsed` and
+    `<name>_summary.txt` to `out_dir`."""
+    global _active
+    profiler = Profiler(interval=interval)
+    _active = profiler
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        _active = None
+        collapsed, summary = profiler.write_report(out_dir, name, top)
+        print(profiler.summary(top))
+        print(f"Saved {collapsed}")
+        print(f"Saved {summary}")
@@ -0,0 +1,395 @@
+"""
+Generator regression harness with golden checksums.
+
+Runs every shapes.generate_* function and world_gen.generate_world over a
+grid of seeds and parameters, hashes a canonical form of the vertex, face
+and color buffers, and compares the digests with golden/digests.json.
+Each case is also timed (best of --repeat runs). Timings are machine
+specific, so they are never checked in: save a local baseline before a
+rework and compare against it afterwards to measure the speedup.
+
+    python3 regression.py              # check against the golden digests
+    python3 regression.py --update     # re-record after an intended change
+    python3 regression.py -k house -r 20
+    python3 regression.py --save-baseline /tmp/before.json
+    python3 regression.py --baseline /tmp/before.json
+
+Canonical form: faces, limbs and the object table layout are hashed
+exactly. Float buffers (vertices, colors, AABBs, crowd paths and agents) are
+snapped to a grid of `tolerance` (1e-5 by default) and hashed; that is only a
+fast path, since a value near a grid midpoint can round either way after a
+tiny change. When a float digest differs, the buffer is compared element by
+element with the reference values stored in golden/buffers/ (kept at a tenth
+of the tolerance), and the case only fails if some value is more than
+`tolerance` away.
+"""
+import argparse
+import array
+import contextlib
+import hashlib
+import io
+import json
+import os
+import random
+import re
+import struct
+import sys
+import time
+import zlib
+
+import shapes
+import world_gen
+
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden")
+GOLDEN_PATH = os.path.join(GOLDEN_DIR, "digests.json")
+BUFFER_DIR = os.path.join(GOLDEN_DIR, "buffers")
+DEFAULT_TOLERANCE = 1e-5
+# Reference buffers are stored on a grid this much finer than the tolerance
+BUFFER_RESOLUTION = 10
+# Most cases run in well under a millisecond; one run is too noisy to time.
+# Slow cases stop repeating once they have used their time budget.
+DEFAULT_REPEAT = 20
+MIN_REPEAT = 3
+# Every case runs at least this often so the determinism check always happens
+MIN_DETERMINISM_RUNS = 2
+CASE_TIME_BUDGET = 0.25
+
+# Fixed city configs, independent of world_gen.CONFIG so that tuning the
+# live config does not invalidate the golden digests
+CITY_CONFIGS = {
+    "small": {
+        "city_size": 80,
+        "num_houses": 3,
+        "num_shops": 2,
+        "num_skyscrapers": 2,
+        "num_medium_buildings": 2,
+        "num_trees": 4,
+        "num_streetlights": 4,
+        "num_benches": 2,
+        "num_humans": 3,
+        "num_crystals": 1,
+        "num_pedestrians": 50,
+    },
+    "default": {
+        "city_size": 80,
+        "num_houses": 15,
+        "num_shops": 8,
+        "num_skyscrapers": 6,
+        "num_medium_buildings": 10,
+        "num_trees": 40,
+        "num_streetlights": 25,
+        "num_benches": 10,
+        "num_humans": 20,
+        "num_crystals": 5,
+        "num_pedestrians": 2000,
+    },
+}
+
+# (function name, kwargs) grid; every case is run after random.seed(case seed)
+SEEDS = [1, 7, 42]
+CASES = {
+    "generate_box": [
+        {},
+        {"width": 2.5, "height": 0.5, "depth": 4, "color": [0.2, 0.4, 0.6]},
+    ],
+    "generate_crystal_cluster": [{"seed": s} for s in SEEDS],
+    "generate_pro_tree": [{"seed": s} for s in SEEDS] + [{"seed": 123, "levels": 2}],
+    "generate_building": [
+        {"width": 4, "height": 10, "depth": 5, "floors": 4},
+        {"width": 7.5, "height": 19, "depth": 6.2, "floors": 7},
+    ],
+    "generate_house": [{"floors": f, "seed": s} for f in [1, 3] for s in SEEDS],
+    "generate_shop": [{"width": w, "seed": s} for w in [6, 10] for s in SEEDS],
+    "generate_skyscraper": [{"floors": f, "seed": s} for f in [15, 30] for s in SEEDS],
+    "generate_streetlight": [{}, {"height": 7}],
+    "generate_bench": [{}],
+    "generate_road_segment": [{}, {"length": 80, "width": 6}],
+    "generate_humanoid": [{"seed": s} for s in SEEDS],
+    "generate_humanoid_prototype": [{"palette": p} for p in [0, 13, len(shapes.HUMAN_PALETTES) - 1]],
+    "generate_world": [{"config": "small"}, {"config": "default"}],
+}
+CASE_SEEDS = [1, 2]
+
+
+def _quantize(values, step):
+    data = array.array("q", [round(v / step) for v in values])
+    if sys.byteorder != "little":
+        data.byteswap()
+    return data
+
+
+def _integers(rows):
+    data = bytearray()
+    for row in rows:
+        data += struct.pack(f"<{len(row)}q", *row)
+    return data
+
+
+def _digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _flatten(rows):
+    return [v for row in rows for v in row]
+
+
+def float_buffers(mesh):
+    """Flat float buffers of a mesh, compared within the tolerance"""
+    buffers = {
+        "vertices": _flatten(mesh.vertices),
+        "colors": _flatten(mesh.colors),
+    }
+    if hasattr(mesh, "objects"):
+        buffers["aabb"] = [v for o in mesh.objects for corner in o["aabb"] for v in corner]
+    if hasattr(mesh, "crowd"):
+        buffers["paths"] = _flatten(mesh.crowd["paths"])
+        buffers["agents"] = list(mesh.crowd["agents"])
+    return buffers
+
+
+def canonical_digests(mesh, buffers, tolerance=DEFAULT_TOLERANCE):
+    """Exact digests of the integer data plus quantized float buffer digests"""
+    digests = {
+        "counts": f"{len(mesh.vertices)}v/{len(mesh.faces)}f/{len(mesh.colors)}c",
+        "faces": _digest(_integers(mesh.faces)),
+    }
+    if hasattr(mesh, "limbs"):
+        digests["limbs"] = _digest(_integers([mesh.limbs]))
+    if hasattr(mesh, "objects"):
+        table = [[o["type"], o["seed"], o["vertex_start"], o["vertex_count"],
+                  o["face_start"], o["face_count"]] for o in mesh.objects]
+        digests["objects"] = _digest(json.dumps(table).encode("utf-8"))
+    for name, values in buffers.items():
+        digests[name] = _digest(_quantize(values, tolerance).tobytes())
+    return digests
+
+
+def _buffer_path(case_id):
+    return os.path.join(BUFFER_DIR, re.sub(r"[^A-Za-z0-9_.=@-]+", "_", case_id) + ".bin")
+
+
+def save_buffers(case_id, buffers, tolerance):
+    """Store float buffers on a grid of tolerance / BUFFER_RESOLUTION"""
+    step = tolerance / BUFFER_RESOLUTION
+    header = {name: len(values) for name, values in buffers.items()}
+    blob = bytearray(json.dumps(header).encode("utf-8") + b"\n")
+    for values in buffers.values():
+        blob += _quantize(values, step).tobytes()
+    os.makedirs(BUFFER_DIR, exist_ok=True)
+    with open(_buffer_path(case_id), 'wb') as f:
+        f.write(zlib.compress(bytes(blob), 9))
+
+
+def load_buffers(case_id, tolerance):
+    path = _buffer_path(case_id)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        blob = zlib.decompress(f.read())
+    header_end = blob.index(b"\n")
+    header = json.loads(blob[:header_end])
+    step = tolerance / BUFFER_RESOLUTION
+    buffers = {}
+    offset = header_end + 1
+    for name, count in header.items():
+        values = array.array("q")
+        values.frombytes(blob[offset:offset + count * 8])
+        if sys.byteorder != "little":
+            values.byteswap()
+        buffers[name] = [v * step for v in values]
+        offset += count * 8
+    return buffers
+
+
+def max_error(reference, values):
+    """Largest absolute difference, or None if the lengths differ"""
+    if len(reference) != len(values):
+        return None
+    return max((abs(a - b) for a, b in zip(reference, values)), default=0.0)
+
+
+def _run(name, kwargs):
+    if name == "generate_world":
+        # generate_world reports progress on stdout
+        with contextlib.redirect_stdout(io.StringIO()):
+            return world_gen.generate_world(CITY_CONFIGS[kwargs["config"]])
+    return getattr(shapes, name)(**kwargs)
+
+
+def iter_cases(keyword=None):
+    for name, grid in CASES.items():
+        for kwargs in grid:
+            for case_seed in CASE_SEEDS:
+                params = ",".join(f"{k}={v}" for k, v in kwargs.items())
+                case_id = f"{name}({params})@{case_seed}"
+                if keyword is None or keyword in case_id:
+                    yield case_id, name, kwargs, case_seed
+
+
+def run_case(name, kwargs, case_seed, tolerance, repeat=1):
+    """Return (digests, float buffers, best seconds) for one case.
+
+    Runs up to `repeat` times (never fewer than MIN_DETERMINISM_RUNS), but
+    stops early once a slow case has used its time budget (after at least
+    MIN_REPEAT runs). The first and last runs are compared to catch
+    non-determinism; hashing dominates small cases, so the runs in between
+    are only timed.
+    """
+    runs = max(repeat, MIN_DETERMINISM_RUNS)
+    times = []
+    digests = None
+    buffers = None
+    mesh = None
+    while len(times) < runs:
+        random.seed(case_seed)
+        start = time.perf_counter()
+        mesh = _run(name, kwargs)
+        times.append(time.perf_counter() - start)
+        if digests is None:
+            buffers = float_buffers(mesh)
+            digests = canonical_digests(mesh, buffers, tolerance)
+            mesh = None
+        if len(times) >= max(MIN_REPEAT, MIN_DETERMINISM_RUNS) and sum(times) > CASE_TIME_BUDGET:
+            break
+    if canonical_digests(mesh, float_buffers(mesh), tolerance) != digests:
+        raise AssertionError(f"{name}{kwargs} is not deterministic for seed {case_seed}")
+    return digests, buffers, min(times)
+
+
+def compare(case_id, expected, digests, buffers, tolerance):
+    """Status string and whether the case passed"""
+    changed = [k for k in digests if expected.get(k) != digests[k]]
+    if not changed:
+        return "ok", True
+
+    # Float digests can differ by grid rounding alone; check the real values
+    reference = load_buffers(case_id, tolerance) or {}
+    exact = [k for k in changed if k not in buffers]
+    outside = []
+    worst = 0.0
+    for name in changed:
+        if name not in buffers:
+            continue
+        err = max_error(reference[name], buffers[name]) if name in reference else None
+        if err is None or err > tolerance:
+            outside.append(name)
+        else:
+            worst = max(worst, err)
+    if exact or outside:
+        return "FAIL " + ",".join(exact + outside), False
+    return f"ok ~{worst:.1e}", True
+
+
+def uncovered_generators():
+    """generate_* functions in shapes.py that have no cases"""
+    return sorted(
+        attr for attr in vars(shapes)
+        if attr.startswith("generate_") and callable(getattr(shapes, attr)) and attr not in CASES
+    )
+
+
+def load_golden(path=GOLDEN_PATH):
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_golden(golden, path=GOLDEN_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(golden, f, indent=1, sort_keys=True)
+        f.write("\n")
+    print(f"Saved {path}")
+
+
+def load_baseline(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(timings, path):
+    with open(path, 'w') as f:
+        json.dump(timings, f, indent=1, sort_keys=True)
+        f.write("\n")
+    print(f"Saved {path}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check generators against golden digests")
+    parser.add_argument("--update", action="store_true", help="re-record the golden digests")
+    parser.add_argument("-k", dest="keyword", help="only run cases whose id contains this text")
+    parser.add_argument("-r", "--repeat", type=int, default=DEFAULT_REPEAT,
+                        help="runs per case, best time is kept")
+    parser.add_argument("--golden", default=GOLDEN_PATH, help="golden digest file")
+    parser.add_argument("--baseline", help="local timing file to report speedups against")
+    parser.add_argument("--save-baseline", help="write this run's timings to a local file")
+    args = parser.parse_args(argv)
+
+    missing = uncovered_generators()
+    if missing:
+        print(f"No regression cases for: {', '.join(missing)}")
+        return 1
+
+    golden = load_golden(args.golden)
+    if golden is None and not args.update:
+        print(f"No golden digests at {args.golden}, run with --update first")
+        return 1
+    tolerance = golden["tolerance"] if golden else DEFAULT_TOLERANCE
+    recorded = golden["cases"] if golden else {}
+    baseline = load_baseline(args.baseline) if args.baseline else {}
+
+    failures = []
+    results = {}
+    timings = {}
+    total = 0.0
+    for case_id, name, kwargs, case_seed in iter_cases(args.keyword):
+        digests, buffers, seconds = run_case(name, kwargs, case_seed, tolerance, args.repeat)
+        total += seconds
+        results[case_id] = digests
+        timings[case_id] = round(seconds * 1000, 4)
+
+        expected = recorded.get(case_id)
+        if args.update:
+            status = "RECORD"
+            save_buffers(case_id, buffers, tolerance)
+        elif expected is None:
+            status = "NEW"
+            failures.append(case_id)
+        else:
+            status, passed = compare(case_id, expected, digests, buffers, tolerance)
+            if not passed:
+                failures.append(case_id)
+
+        speedup = ""
+        if case_id in baseline and seconds > 0:
+            speedup = f"{baseline[case_id] / (seconds * 1000):6.2f}x"
+        print(f"  {status:<16} {seconds * 1000:9.3f} ms {speedup:>8}  {case_id}")
+
+    print(f"\n{len(results)} cases, {total:.3f}s (best of up to {args.repeat} runs)")
+
+    if args.save_baseline:
+        save_baseline(timings, args.save_baseline)
+
+    if args.update:
+        if args.keyword and golden:
+            recorded.update(results)
+            results = recorded
+        else:
+            # Drop reference buffers of cases that no longer exist
+            keep = {os.path.basename(_buffer_path(case_id)) for case_id in results}
+            for filename in os.listdir(BUFFER_DIR):
+                if filename not in keep:
+                    os.remove(os.path.join(BUFFER_DIR, filename))
+        save_golden({"tolerance": tolerance, "cases": results}, args.golden)
+        return 0
+
+    if failures:
+        print(f"{len(failures)} case(s) differ from the golden digests")
+        return 1
+    print("All digests match")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -444,58 +444,92 @@ def generate_road_segment(length=10, width=8):
 # HUMANOID FIGURES
 # =============================================================================
 
-def generate_humanoid(seed=None):
-    """Simple capsule-based human figure"""
-    if seed: random.seed(seed)
-    mesh = Mesh()
-    
-    # Random clothing colors
-    shirt_colors = [
-        [0.8, 0.2, 0.2],  # Red
-        [0.2, 0.5, 0.8],  # Blue
-        [0.2, 0.7, 0.3],  # Green
-        [0.9, 0.9, 0.2],  # Yellow
-        [0.6, 0.3, 0.7],  # Purple
-        [0.1, 0.1, 0.1],  # Black
-        [0.95, 0.95, 0.95] # White
-    ]
-    pants_colors = [
-        [0.2, 0.2, 0.3],  # Dark blue
-        [0.1, 0.1, 0.1],  # Black
-        [0.4, 0.35, 0.3], # Khaki
-        [0.3, 0.3, 0.35]  # Gray
-    ]
-    skin_color = [0.9, 0.75, 0.65]
-    
-    shirt_color = random.choice(shirt_colors)
-    pants_color = random.choice(pants_colors)
+# Random clothing colors
+HUMAN_SHIRT_COLORS = [
+    [0.8, 0.2, 0.2],  # Red
+    [0.2, 0.5, 0.8],  # Blue
+    [0.2, 0.7, 0.3],  # Green
+    [0.9, 0.9, 0.2],  # Yellow
+    [0.6, 0.3, 0.7],  # Purple
+    [0.1, 0.1, 0.1],  # Black
+    [0.95, 0.95, 0.95] # White
+]
+HUMAN_PANTS_COLORS = [
+    [0.2, 0.2, 0.3],  # Dark blue
+    [0.1, 0.1, 0.1],  # Black
+    [0.4, 0.35, 0.3], # Khaki
+    [0.3, 0.3, 0.35]  # Gray
+]
+HUMAN_SKIN_COLOR = [0.9, 0.75, 0.65]
+HUMAN_SHOE_COLOR = [0.15, 0.1, 0.1]
+
+# Every (shirt, pants) combination, indexed by crowd agents
+HUMAN_PALETTES = [(shirt, pants) for shirt in HUMAN_SHIRT_COLORS for pants in HUMAN_PANTS_COLORS]
+
+# Limb ids tagged on prototype vertices so the viewer can swing them
+LIMB_BODY = 0
+LIMB_LEFT_ARM = 1
+LIMB_RIGHT_ARM = 2
+LIMB_LEFT_LEG = 3
+LIMB_RIGHT_LEG = 4
+
+def _humanoid_parts(shirt_color, pants_color):
+    """(box, offset, limb) for every part of a humanoid"""
+    parts = []
     
     # Head
-    head = generate_box(0.4, 0.45, 0.35, color=skin_color)
-    mesh.add_mesh(head, offset=[0, 1.65, 0])
+    head = generate_box(0.4, 0.45, 0.35, color=HUMAN_SKIN_COLOR)
+    parts.append((head, [0, 1.65, 0], LIMB_BODY))
     
     # Torso
     torso = generate_box(0.6, 0.7, 0.35, color=shirt_color)
-    mesh.add_mesh(torso, offset=[0, 1.15, 0])
+    parts.append((torso, [0, 1.15, 0], LIMB_BODY))
     
     # Arms
-    for side in [-1, 1]:
+    for side, limb in [(-1, LIMB_LEFT_ARM), (1, LIMB_RIGHT_ARM)]:
         arm = generate_box(0.2, 0.6, 0.2, color=shirt_color)
-        mesh.add_mesh(arm, offset=[side * 0.4, 1.1, 0])
+        parts.append((arm, [side * 0.4, 1.1, 0], limb))
         # Hand
-        hand = generate_box(0.15, 0.2, 0.15, color=skin_color)
-        mesh.add_mesh(hand, offset=[side * 0.4, 0.7, 0])
+        hand = generate_box(0.15, 0.2, 0.15, color=HUMAN_SKIN_COLOR)
+        parts.append((hand, [side * 0.4, 0.7, 0], limb))
     
     # Legs
-    for side in [-1, 1]:
+    for side, limb in [(-1, LIMB_LEFT_LEG), (1, LIMB_RIGHT_LEG)]:
         leg = generate_box(0.25, 0.8, 0.25, color=pants_color)
-        mesh.add_mesh(leg, offset=[side * 0.18, 0.4, 0])
+        parts.append((leg, [side * 0.18, 0.4, 0], limb))
     
     # Feet/Shoes
-    shoe_color = [0.15, 0.1, 0.1]
-    for side in [-1, 1]:
-        shoe = generate_box(0.25, 0.15, 0.35, color=shoe_color)
-        mesh.add_mesh(shoe, offset=[side * 0.18, 0.075, 0.05])
+    for side, limb in [(-1, LIMB_LEFT_LEG), (1, LIMB_RIGHT_LEG)]:
+        shoe = generate_box(0.25, 0.15, 0.35, color=HUMAN_SHOE_COLOR)
+        parts.append((shoe, [side * 0.18, 0.075, 0.05], limb))
+    
+    return parts
+
+def generate_humanoid(seed=None):
+    """Simple capsule-based human figure"""
+    if seed: random.seed(seed)
+    mesh = Mesh()
+    
+    shirt_color = random.choice(HUMAN_SHIRT_COLORS)
+    pants_color = random.choice(HUMAN_PANTS_COLORS)
+    
+    for part, offset, _ in _humanoid_parts(shirt_color, pants_color):
+        mesh.add_mesh(part, offset=offset)
     
     return mesh
 
+def generate_humanoid_prototype(palette=0):
+    """Rig-less humanoid for instanced crowds, one per clothing palette.
+    
+    Same geometry as generate_humanoid, facing +z, with mesh.limbs holding a
+    LIMB_* id per vertex for the viewer's vertex-shader walk cycle.
+    """
+    shirt_color, pants_color = HUMAN_PALETTES[palette]
+    mesh = Mesh()
+    mesh.limbs = []
+    
+    for part, offset, limb in _humanoid_parts(shirt_color, pants_color):
+        mesh.add_mesh(part, offset=offset)
+        mesh.limbs.extend([limb] * len(part.vertices))
+    
+    return mesh
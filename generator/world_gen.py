@@ -1,8 +1,12 @@
+import argparse
 import json
 import os
 import random
 import math
+import crowd
+import profiling
 import shapes
+import world_pack
 
 OUTPUT_DIR = "output"
 
@@ -18,7 +22,8 @@ CONFIG = {
     "num_trees": 40,           # Trees in outskirts
     "num_streetlights": 25,    # Lamp posts
     "num_benches": 10,         # Park benches
-    "num_humans": 20,          # Humanoid figures
+    "num_humans": 20,          # Humanoid figures baked into the world mesh
+    "num_pedestrians": 2000,   # Instanced walkers exported to crowd.json
     "num_crystals": 5,         # Decorative crystals
 }
 
@@ -28,151 +33,199 @@ def save_mesh(mesh, filename):
         json.dump(mesh.to_dict(), f)
     print(f"Saved {filepath}")
 
+def save_pack(mesh, filename):
+    filepath = os.path.join(OUTPUT_DIR, filename)
+    world_pack.write_pack(mesh, mesh.objects, filepath)
+    print(f"Saved {filepath}")
+
+def place(world, kind, mesh, offset, scale=1.0, seed=None):
+    """Add a generated object to the world and record it in world.objects
+
+    Pass `seed` only if the generator reseeded with it. Generators ignore a
+    seed of 0 (`if seed:`), so callers pass `seed=i or None`.
+    """
+    vertex_start = len(world.vertices)
+    face_start = len(world.faces)
+    world.add_mesh(mesh, offset=offset, scale=scale)
+
+    placed = world.vertices[vertex_start:]
+    aabb = (
+        [min(v[axis] for v in placed) for axis in range(3)],
+        [max(v[axis] for v in placed) for axis in range(3)]
+    )
+    world.objects.append({
+        "type": kind,
+        "seed": seed,
+        "vertex_start": vertex_start,
+        "vertex_count": len(placed),
+        "face_start": face_start,
+        "face_count": len(world.faces) - face_start,
+        "aabb": aabb
+    })
+
 def generate_world(config=None):
     if config is None:
         config = CONFIG
     
     world = shapes.Mesh()
+    world.objects = []
     stats = {}
     
     # 1. Ground
-    ground_size = 200
-    ground = shapes.generate_box(ground_size, 1, ground_size, color=[0.08, 0.08, 0.12])
-    world.add_mesh(ground, offset=[0, -0.5, 0])
+    with profiling.stage("ground"):
+        ground_size = 200
+        ground = shapes.generate_box(ground_size, 1, ground_size, color=[0.08, 0.08, 0.12])
+        place(world, "ground", ground, offset=[0, -0.5, 0])
     
     # 2. Roads (Grid pattern)
-    print("Laying Roads...")
-    road_positions = []
-    for i in range(-3, 4):
-        # Horizontal roads
-        road = shapes.generate_road_segment(length=config["city_size"], width=6)
-        world.add_mesh(road, offset=[0, 0, i * 12])
-        road_positions.append(i * 12)
+    with profiling.stage("roads"):
+        print("Laying Roads...")
+        road_positions = []
+        for i in range(-3, 4):
+            # Horizontal roads
+            road = shapes.generate_road_segment(length=config["city_size"], width=6)
+            place(world, "road", road, offset=[0, 0, i * 12])
+            road_positions.append(i * 12)
     
     # 3. SKYSCRAPERS (Downtown core)
-    print("Building Skyscrapers...")
-    stats["skyscrapers"] = 0
-    for i in range(config["num_skyscrapers"]):
-        gx = random.choice([-1, 0, 1]) * 12
-        gz = random.choice([-1, 0, 1]) * 12
-        x = gx + random.uniform(-3, 3)
-        z = gz + random.uniform(-3, 3)
+    with profiling.stage("skyscrapers"):
+        print("Building Skyscrapers...")
+        stats["skyscrapers"] = 0
+        for i in range(config["num_skyscrapers"]):
+            gx = random.choice([-1, 0, 1]) * 12
+            gz = random.choice([-1, 0, 1]) * 12
+            x = gx + random.uniform(-3, 3)
+            z = gz + random.uniform(-3, 3)
         
-        if abs(x) < 6 and abs(z) < 6: continue
+            if abs(x) < 6 and abs(z) < 6: continue
         
-        floors = random.randint(15, 30)
-        building = shapes.generate_skyscraper(floors=floors, seed=i)
-        world.add_mesh(building, offset=[x, 0, z])
-        stats["skyscrapers"] += 1
+            floors = random.randint(15, 30)
+            building = shapes.generate_skyscraper(floors=floors, seed=i)
+            place(world, "skyscraper", building, offset=[x, 0, z], seed=i or None)
+            stats["skyscrapers"] += 1
     
     # 4. MEDIUM BUILDINGS (Original style - surrounding downtown)
-    print("Building Medium Buildings...")
-    stats["medium_buildings"] = 0
-    for i in range(config["num_medium_buildings"]):
-        gx = random.randint(-3, 3) * 12
-        gz = random.randint(-3, 3) * 12
-        x = gx + random.uniform(-4, 4)
-        z = gz + random.uniform(-4, 4)
+    with profiling.stage("medium_buildings"):
+        print("Building Medium Buildings...")
+        stats["medium_buildings"] = 0
+        for i in range(config["num_medium_buildings"]):
+            gx = random.randint(-3, 3) * 12
+            gz = random.randint(-3, 3) * 12
+            x = gx + random.uniform(-4, 4)
+            z = gz + random.uniform(-4, 4)
         
-        if abs(x) < 10 and abs(z) < 10: continue
+            if abs(x) < 10 and abs(z) < 10: continue
         
-        width = random.uniform(4, 8)
-        depth = random.uniform(4, 8)
-        height = random.uniform(10, 20)
-        floors = int(height / 3) + 1
+            width = random.uniform(4, 8)
+            depth = random.uniform(4, 8)
+            height = random.uniform(10, 20)
+            floors = int(height / 3) + 1
         
-        building = shapes.generate_building(width, height, depth, floors)
-        world.add_mesh(building, offset=[x, height/2, z])
-        stats["medium_buildings"] += 1
+            building = shapes.generate_building(width, height, depth, floors)
+            place(world, "building", building, offset=[x, height/2, z])
+            stats["medium_buildings"] += 1
     
     # 5. SHOPS (Commercial district edges)
-    print("Building Shops...")
-    stats["shops"] = 0
-    for i in range(config["num_shops"]):
-        x = random.uniform(-40, 40)
-        z = random.choice([-36, -24, 24, 36]) + random.uniform(-2, 2)
+    with profiling.stage("shops"):
+        print("Building Shops...")
+        stats["shops"] = 0
+        for i in range(config["num_shops"]):
+            x = random.uniform(-40, 40)
+            z = random.choice([-36, -24, 24, 36]) + random.uniform(-2, 2)
         
-        shop = shapes.generate_shop(width=random.uniform(6, 10), seed=i)
-        world.add_mesh(shop, offset=[x, 0, z])
-        stats["shops"] += 1
+            shop = shapes.generate_shop(width=random.uniform(6, 10), seed=i)
+            place(world, "shop", shop, offset=[x, 0, z], seed=i or None)
+            stats["shops"] += 1
     
     # 6. HOUSES (Residential outskirts)
-    print("Building Houses...")
-    stats["houses"] = 0
-    for i in range(config["num_houses"]):
-        angle = random.uniform(0, math.pi * 2)
-        dist = random.uniform(45, 70)
-        x = math.cos(angle) * dist
-        z = math.sin(angle) * dist
+    with profiling.stage("houses"):
+        print("Building Houses...")
+        stats["houses"] = 0
+        for i in range(config["num_houses"]):
+            angle = random.uniform(0, math.pi * 2)
+            dist = random.uniform(45, 70)
+            x = math.cos(angle) * dist
+            z = math.sin(angle) * dist
         
-        floors = random.choice([1, 2, 2, 3])
-        house = shapes.generate_house(floors=floors, seed=i)
-        world.add_mesh(house, offset=[x, 0, z])
-        stats["houses"] += 1
+            floors = random.choice([1, 2, 2, 3])
+            house = shapes.generate_house(floors=floors, seed=i)
+            place(world, "house", house, offset=[x, 0, z], seed=i or None)
+            stats["houses"] += 1
     
     # 7. STREETLIGHTS (Along roads)
-    print("Placing Streetlights...")
-    stats["streetlights"] = 0
-    for i in range(config["num_streetlights"]):
-        x = random.uniform(-40, 40)
-        z = random.choice(road_positions) + random.choice([-4, 4])
+    with profiling.stage("streetlights"):
+        print("Placing Streetlights...")
+        stats["streetlights"] = 0
+        for i in range(config["num_streetlights"]):
+            x = random.uniform(-40, 40)
+            z = random.choice(road_positions) + random.choice([-4, 4])
         
-        light = shapes.generate_streetlight(height=random.uniform(5, 7))
-        world.add_mesh(light, offset=[x, 0, z])
-        stats["streetlights"] += 1
+            light = shapes.generate_streetlight(height=random.uniform(5, 7))
+            place(world, "streetlight", light, offset=[x, 0, z])
+            stats["streetlights"] += 1
     
     # 8. BENCHES (Near roads)
-    print("Placing Benches...")
-    stats["benches"] = 0
-    for i in range(config["num_benches"]):
-        x = random.uniform(-35, 35)
-        z = random.choice(road_positions) + random.choice([-5, 5])
+    with profiling.stage("benches"):
+        print("Placing Benches...")
+        stats["benches"] = 0
+        for i in range(config["num_benches"]):
+            x = random.uniform(-35, 35)
+            z = random.choice(road_positions) + random.choice([-5, 5])
         
-        bench = shapes.generate_bench()
-        world.add_mesh(bench, offset=[x, 0, z])
-        stats["benches"] += 1
+            bench = shapes.generate_bench()
+            place(world, "bench", bench, offset=[x, 0, z])
+            stats["benches"] += 1
     
     # 9. HUMANS (Walking around)
-    print("Spawning Humans...")
-    stats["humans"] = 0
-    for i in range(config["num_humans"]):
-        x = random.uniform(-50, 50)
-        z = random.uniform(-50, 50)
+    with profiling.stage("humans"):
+        print("Spawning Humans...")
+        stats["humans"] = 0
+        for i in range(config["num_humans"]):
+            x = random.uniform(-50, 50)
+            z = random.uniform(-50, 50)
         
-        # Avoid spawning inside buildings (roughly)
-        if abs(x) < 5 and abs(z) < 5: continue
+            # Avoid spawning inside buildings (roughly)
+            if abs(x) < 5 and abs(z) < 5: continue
         
-        human = shapes.generate_humanoid(seed=i)
-        world.add_mesh(human, offset=[x, 0, z])
-        stats["humans"] += 1
+            human = shapes.generate_humanoid(seed=i)
+            place(world, "humanoid", human, offset=[x, 0, z], seed=i or None)
+            stats["humans"] += 1
     
     # 10. TREES (Parks and outskirts)
-    print("Planting Trees...")
-    stats["trees"] = 0
-    for i in range(config["num_trees"]):
-        angle = random.uniform(0, math.pi * 2)
-        dist = random.uniform(50, 95)
-        x = math.cos(angle) * dist
-        z = math.sin(angle) * dist
+    with profiling.stage("trees"):
+        print("Planting Trees...")
+        stats["trees"] = 0
+        for i in range(config["num_trees"]):
+            angle = random.uniform(0, math.pi * 2)
+            dist = random.uniform(50, 95)
+            x = math.cos(angle) * dist
+            z = math.sin(angle) * dist
         
-        scale = random.uniform(0.6, 1.2)
-        tree = shapes.generate_pro_tree(seed=i, levels=3)
-        world.add_mesh(tree, offset=[x, 0, z], scale=scale)
-        stats["trees"] += 1
+            scale = random.uniform(0.6, 1.2)
+            tree = shapes.generate_pro_tree(seed=i, levels=3)
+            place(world, "tree", tree, offset=[x, 0, z], scale=scale, seed=i or None)
+            stats["trees"] += 1
     
     # 11. CRYSTALS (Decorative)
-    print("Placing Crystals...")
-    stats["crystals"] = 0
-    for i in range(config["num_crystals"]):
-        angle = random.uniform(0, math.pi * 2)
-        dist = random.uniform(60, 90)
-        x = math.cos(angle) * dist
-        z = math.sin(angle) * dist
+    with profiling.stage("crystals"):
+        print("Placing Crystals...")
+        stats["crystals"] = 0
+        for i in range(config["num_crystals"]):
+            angle = random.uniform(0, math.pi * 2)
+            dist = random.uniform(60, 90)
+            x = math.cos(angle) * dist
+            z = math.sin(angle) * dist
         
-        scale = random.uniform(1.5, 3.0)
-        crystal = shapes.generate_crystal_cluster(seed=i + 200)
-        world.add_mesh(crystal, offset=[x, 0, z], scale=scale)
-        stats["crystals"] += 1
+            scale = random.uniform(1.5, 3.0)
+            crystal = shapes.generate_crystal_cluster(seed=i + 200)
+            place(world, "crystal", crystal, offset=[x, 0, z], scale=scale, seed=i + 200)
+            stats["crystals"] += 1
+    
+    # 12. PEDESTRIANS (Instanced crowd, not baked into the mesh)
+    with profiling.stage("crowd"):
+        print("Populating Sidewalks...")
+        num_pedestrians = config.get("num_pedestrians", 0)
+        world.crowd = crowd.build_crowd(num_pedestrians, road_positions, config["city_size"])
     
     # Print stats
     print("\n--- CITY STATISTICS ---")
@@ -181,20 +234,46 @@ def generate_world(config=None):
         print(f"  {key}: {val}")
         total += val
     print(f"  TOTAL OBJECTS: {total}")
+    print(f"  PEDESTRIANS (instanced): {num_pedestrians}")
     print(f"  VERTICES: {len(world.vertices)}")
     print(f"  TRIANGLES: {len(world.faces)}")
     
     return world
 
+def save_crowd(crowd_data, filename):
+    filepath = os.path.join(OUTPUT_DIR, filename)
+    with open(filepath, 'w') as f:
+        json.dump(crowd_data, f, separators=(",", ":"))
+    print(f"Saved {filepath}")
+
+def build(config=None):
+    with profiling.stage("generate_world"):
+        world = generate_world(config)
+    with profiling.stage("save_json"):
+        save_mesh(world, "world.json")
+        save_crowd(world.crowd, "crowd.json")
+    with profiling.stage("save_pack"):
+        save_pack(world, "world.pfxw")
+
 def main():
+    parser = argparse.ArgumentParser(description="Generate the procedural city")
+    parser.add_argument("--profile", action="store_true",
+                        help="profile generators and stages, write reports to output/profile")
+    parser.add_argument("--profile-top", type=int, default=15,
+                        help="rows per table in the profile summary")
+    args = parser.parse_args()
+
     if not os.path.exists(OUTPUT_DIR):
         os.makedirs(OUTPUT_DIR)
 
     print("=" * 50)
     print("PROCEDURAL CITY GENERATOR")
     print("=" * 50)
-    world = generate_world()
-    save_mesh(world, "world.json")
+    if args.profile:
+        with profiling.profile(os.path.join(OUTPUT_DIR, "profile"), "world", top=args.profile_top):
+            build()
+    else:
+        build()
     print("\n✓ Done! Open viewer to see your city.")
 
 if __name__ == "__main__":
@@ -0,0 +1,257 @@
+"""
+Binary world container (.pfxw) with a random-access object table.
+
+world.json has to be read and parsed in full before any single object can be
+looked at. The pack stores the same data as flat little-endian sections so a
+reader can mmap the file and slice out one object in constant time.
+
+Layout (all offsets are absolute byte offsets, sections 16-byte aligned):
+
+    HEADER        magic "PFXW", version, counts, section offsets
+    TYPE NAMES    NUL-separated object type names (index = type id)
+    OBJECT TABLE  one fixed-size record per placed object
+    VERTICES      float32 x, y, z per vertex
+    COLORS        float32 r, g, b per vertex
+    INDICES       uint32 per triangle corner (world-wide vertex numbers)
+
+Each object record holds its type id, seed, AABB and the byte ranges of its
+data inside the vertex, color and index sections, so the viewer can fetch an
+object with plain HTTP Range requests.
+"""
+import array
+import mmap
+import struct
+import sys
+
+MAGIC = b"PFXW"
+VERSION = 1
+ALIGNMENT = 16
+
+# magic, version, object_count, vertex_count, index_count, type_names_size,
+# then offsets of: type names, object table, vertices, colors, indices
+HEADER = struct.Struct("<4sIIIII5Q")
+
+# type id, seed, aabb min xyz, aabb max xyz,
+# then (offset, size) byte ranges for vertices, colors and indices
+OBJECT_RECORD = struct.Struct("<Ii6f6Q")
+
+NO_SEED = -1
+
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _float_array(rows):
+    data = array.array("f")
+    for row in rows:
+        data.extend(row)
+    return data
+
+
+def _index_array(faces):
+    data = array.array("I")
+    for face in faces:
+        data.extend(face)
+    return data
+
+
+def _little_endian_bytes(data):
+    if sys.byteorder != "little":
+        data = array.array(data.typecode, data)
+        data.byteswap()
+    return data.tobytes()
+
+
+def write_pack(mesh, objects, filepath):
+    """Write `mesh` and its object list to a .pfxw file.
+
+    `objects` is a list of dicts with the keys produced by world_gen:
+    type, seed, vertex_start, vertex_count, face_start, face_count, aabb.
+    """
+    type_names = []
+    for obj in objects:
+        if obj["type"] not in type_names:
+            type_names.append(obj["type"])
+    names_blob = b"\0".join(name.encode("utf-8") for name in type_names)
+
+    vertices = _little_endian_bytes(_float_array(mesh.vertices))
+    colors = _little_endian_bytes(_float_array(mesh.colors))
+    indices = _little_endian_bytes(_index_array(mesh.faces))
+
+    names_offset = _align(HEADER.size)
+    table_offset = _align(names_offset + len(names_blob))
+    vertex_offset = _align(table_offset + OBJECT_RECORD.size * len(objects))
+    color_offset = _align(vertex_offset + len(vertices))
+    index_offset = _align(color_offset + len(colors))
+
+    header = HEADER.pack(
+        MAGIC, VERSION, len(objects), len(mesh.vertices), len(mesh.faces) * 3,
+        len(names_blob),
+        names_offset, table_offset, vertex_offset, color_offset, index_offset
+    )
+
+    vec_size = 3 * 4
+    tri_size = 3 * 4
+    records = []
+    for obj in objects:
+        seed = obj["seed"] if obj["seed"] is not None else NO_SEED
+        records.append(OBJECT_RECORD.pack(
+            type_names.index(obj["type"]), seed,
+            *obj["aabb"][0], *obj["aabb"][1],
+            vertex_offset + obj["vertex_start"] * vec_size, obj["vertex_count"] * vec_size,
+            color_offset + obj["vertex_start"] * vec_size, obj["vertex_count"] * vec_size,
+            index_offset + obj["face_start"] * tri_size, obj["face_count"] * tri_size
+        ))
+
+    with open(filepath, 'wb') as f:
+        for offset, blob in [
+            (0, header),
+            (names_offset, names_blob),
+            (table_offset, b"".join(records)),
+            (vertex_offset, vertices),
+            (color_offset, colors),
+            (index_offset, indices),
+        ]:
+            f.write(b"\0" * (offset - f.tell()))
+            f.write(blob)
+
+
+class PackObject:
+    """One entry of the object table, with byte ranges into the sections."""
+
+    def __init__(self, index, type_name, seed, aabb, vertex_range, color_range, index_range):
+        self.index = index
+        self.type = type_name
+        self.seed = None if seed == NO_SEED else seed
+        self.aabb = aabb
+        self.vertex_range = vertex_range
+        self.color_range = color_range
+        self.index_range = index_range
+
+    @property
+    def vertex_start(self):
+        """First world-wide vertex number owned by this object."""
+        return self.vertex_range[0]
+
+    def __repr__(self):
+        return f"PackObject({self.index}, {self.type!r}, seed={self.seed})"
+
+
+class WorldPack:
+    """Memory-mapped view of a .pfxw file.
+
+    Object accessors return zero-copy memoryviews (or NumPy views) into the
+    mapping. Open with `writable=True` to patch vertex or color data in place.
+    Views may outlive `close()`; the mapping is then unmapped once the last
+    view is garbage collected.
+    """
+
+    def __init__(self, filepath, writable=False):
+        if sys.byteorder != "little":
+            raise RuntimeError("WorldPack views require a little-endian host")
+        self._map = None
+        self._view = None
+        self._file = open(filepath, 'r+b' if writable else 'rb')
+        try:
+            access = mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ
+            self._map = mmap.mmap(self._file.fileno(), 0, access=access)
+            self._view = memoryview(self._map)
+
+            (magic, version, self.object_count, self.vertex_count, self.index_count,
+             names_size, names_offset, self._table_offset, self._vertex_offset,
+             self._color_offset, self._index_offset) = HEADER.unpack_from(self._map, 0)
+            if magic != MAGIC:
+                raise ValueError(f"{filepath} is not a world pack")
+            if version != VERSION:
+                raise ValueError(f"Unsupported world pack version {version}")
+
+            names_blob = bytes(self._view[names_offset:names_offset + names_size])
+            self.type_names = names_blob.decode("utf-8").split("\0") if names_blob else []
+        except Exception:
+            # The caller never gets an object to close
+            self.close()
+            raise
+
+    def close(self):
+        if self._view is not None:
+            self._view.release()
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                # Views handed out are still alive; they keep the mapping open
+                pass
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.object_count
+
+    def object(self, index):
+        if not 0 <= index < self.object_count:
+            raise IndexError(index)
+        fields = OBJECT_RECORD.unpack_from(self._map, self._table_offset + index * OBJECT_RECORD.size)
+        type_id, seed = fields[0], fields[1]
+        aabb = (fields[2:5], fields[5:8])
+        v_off, v_size, c_off, c_size, i_off, i_size = fields[8:]
+        vec_size = 3 * 4
+        return PackObject(
+            index, self.type_names[type_id], seed, aabb,
+            ((v_off - self._vertex_offset) // vec_size, v_size // vec_size),
+            ((c_off - self._color_offset) // vec_size, c_size // vec_size),
+            ((i_off - self._index_offset) // 4, i_size // 4),
+        )
+
+    def objects(self):
+        for i in range(self.object_count):
+            yield self.object(i)
+
+    def _section(self, offset, start, count, typecode):
+        size = 4
+        begin = offset + start * size
+        return self._view[begin:begin + count * size].cast(typecode)
+
+    def vertices(self, index):
+        """Flat float32 x, y, z view of one object's vertices."""
+        start, count = self.object(index).vertex_range
+        return self._section(self._vertex_offset, start * 3, count * 3, "f")
+
+    def colors(self, index):
+        """Flat float32 r, g, b view of one object's vertex colors."""
+        start, count = self.object(index).color_range
+        return self._section(self._color_offset, start * 3, count * 3, "f")
+
+    def indices(self, index):
+        """Flat uint32 view of one object's triangle corners.
+
+        Values are world-wide vertex numbers; subtract `vertex_start` of the
+        object to index into `vertices(index)`.
+        """
+        start, count = self.object(index).index_range
+        return self._section(self._index_offset, start, count, "I")
+
+    def numpy_view(self, index):
+        """(vertices, colors, indices) as NumPy views shaped (n, 3).
+
+        NumPy is optional and only imported when this is called.
+        """
+        import numpy as np
+
+        def rows(view, dtype):
+            return np.frombuffer(view, dtype=dtype).reshape(-1, 3)
+
+        return (
+            rows(self.vertices(index), np.float32),
+            rows(self.colors(index), np.float32),
+            rows(self.indices(index), np.uint32),
+        )
+
+    def find(self, type_name):
+        """Indices of all objects of the given type."""
+        return [obj.index for obj in self.objects() if obj.type == type_name]
@@ -4,6 +4,8 @@ import { EffectComposer } from 'three/examples/jsm/postprocessing/EffectComposer
 import { RenderPass } from 'three/examples/jsm/postprocessing/RenderPass.js';
 import { UnrealBloomPass } from 'three/examples/jsm/postprocessing/UnrealBloomPass.js';
 import * as dat from 'dat.gui';
+import { parseWorldPack } from './src/worldPack.js';
+import { loadCrowd } from './src/crowd.js';
 
 // Shaders
 import cartoonVert from './src/shaders/cartoon.vert?raw';
@@ -12,6 +14,8 @@ import neonVert from './src/shaders/neon.vert?raw';
 import neonFrag from './src/shaders/neon.frag?raw';
 import hologramVert from './src/shaders/hologram.vert?raw';
 import hologramFrag from './src/shaders/hologram.frag?raw';
+import crowdVert from './src/shaders/crowd.vert?raw';
+import crowdFrag from './src/shaders/crowd.frag?raw';
 
 // =============================================================================
 // SCENE SETUP
@@ -128,6 +132,7 @@ composer.addPass(bloomPass);
 // MATERIALS - 3 STYLES
 // =============================================================================
 let worldMesh = null;
+let crowd = null;
 let currentStyle = 'Neon';
 
 const materials = {
@@ -183,8 +188,38 @@ function setStyle(styleName) {
 // =============================================================================
 // WORLD LOADING
 // =============================================================================
+function addWorldMesh(geometry) {
+    geometry.computeVertexNormals();
+    worldMesh = new THREE.Mesh(geometry, materials[currentStyle]);
+    scene.add(worldMesh);
+}
+
+// Binary pack: sections are used as-is, no JSON parsing or flattening
+// Returns false on any fetch or parse error so loadWorld falls back to JSON
+async function loadWorldPack() {
+    let pack;
+    try {
+        const response = await fetch('./assets/world.pfxw');
+        if (!response.ok) return false;
+        pack = parseWorldPack(await response.arrayBuffer());
+    } catch (err) {
+        return false;
+    }
+
+    const geometry = new THREE.BufferGeometry();
+    geometry.setAttribute('position', new THREE.BufferAttribute(pack.vertices, 3));
+    geometry.setAttribute('color', new THREE.BufferAttribute(pack.colors, 3));
+    geometry.setIndex(new THREE.BufferAttribute(pack.indices, 1));
+    addWorldMesh(geometry);
+
+    console.log(`✓ City pack loaded: ${pack.objects.length} objects, ${pack.header.vertexCount} vertices, ${pack.header.indexCount / 3} triangles`);
+    return true;
+}
+
 async function loadWorld() {
     try {
+        if (await loadWorldPack()) return;
+
         const response = await fetch('./assets/world.json');
         const data = await response.json();
 
@@ -200,10 +235,7 @@ async function loadWorld() {
             geometry.setAttribute('color', new THREE.BufferAttribute(colors, 3));
         }
 
-        geometry.computeVertexNormals();
-
-        worldMesh = new THREE.Mesh(geometry, materials[currentStyle]);
-        scene.add(worldMesh);
+        addWorldMesh(geometry);
 
         console.log(`✓ City loaded: ${data.vertices.length} vertices, ${data.faces.length} triangles`);
 
@@ -324,9 +356,14 @@ function animate() {
         materials['Neon'].uniforms.uTime.value = time * 0.001;
     }
 
+    // Walk the crowd
+    if (crowd) {
+        crowd.update(delta, time * 0.001);
+    }
+
     // Update stats
     statsDiv.innerHTML = `
-        FPS: ${fps} | Style: ${currentStyle}<br>
+        FPS: ${fps} | Style: ${currentStyle}${crowd ? ` | Crowd: ${crowd.count}` : ''}<br>
         Pos: ${camera.position.x.toFixed(1)}, ${camera.position.z.toFixed(1)}
     `;
 
@@ -338,6 +375,7 @@ function animate() {
 // INIT
 // =============================================================================
 loadWorld();
+loadCrowd(scene, crowdVert, crowdFrag).then(c => crowd = c);
 animate();
 
 window.addEventListener('resize', () => {
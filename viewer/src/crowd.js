@@ -0,0 +1,106 @@
+import * as THREE from 'three';
+
+// =============================================================================
+// INSTANCED CROWD
+// Loads crowd.json from generator/crowd.py: one InstancedBufferGeometry per
+// clothing palette, per-agent state moved along sidewalk paths on the CPU,
+// limbs animated in the vertex shader.
+// =============================================================================
+export async function loadCrowd(scene, vertexShader, fragmentShader) {
+    let data;
+    try {
+        const response = await fetch('./assets/crowd.json');
+        if (!response.ok) return null;
+        data = await response.json();
+    } catch (err) {
+        return null;
+    }
+
+    const field = Object.fromEntries(data.agent_fields.map((name, i) => [name, i]));
+    const stride = data.agent_fields.length;
+    const count = data.agents.length / stride;
+
+    const material = new THREE.ShaderMaterial({
+        uniforms: {
+            uTime: { value: 0 },
+            uCadence: { value: 6.0 },
+            uSwing: { value: 0.5 }
+        },
+        vertexShader,
+        fragmentShader,
+        vertexColors: true
+    });
+
+    // Precompute each path's direction, normal and length
+    const paths = data.paths.map(([x0, z0, x1, z1]) => {
+        const length = Math.hypot(x1 - x0, z1 - z0);
+        const dx = (x1 - x0) / length;
+        const dz = (z1 - z0) / length;
+        return { x0, z0, dx, dz, nx: -dz, nz: dx, length, heading: Math.atan2(dx, dz) };
+    });
+
+    // Group agents by palette, one instanced draw per palette
+    const byPalette = data.prototypes.map(() => []);
+    for (let i = 0; i < count; i++) {
+        byPalette[data.agents[i * stride + field.palette]].push(i);
+    }
+
+    const agents = [];
+    const batches = [];
+    byPalette.forEach((members, palette) => {
+        if (members.length === 0) return;
+        const proto = data.prototypes[palette];
+
+        const geometry = new THREE.InstancedBufferGeometry();
+        geometry.setAttribute('position', new THREE.Float32BufferAttribute(proto.vertices.flat(), 3));
+        geometry.setAttribute('color', new THREE.Float32BufferAttribute(proto.colors.flat(), 3));
+        geometry.setAttribute('limb', new THREE.Float32BufferAttribute(proto.limbs, 1));
+        geometry.setIndex(proto.faces.flat());
+
+        const agentAttr = new THREE.InstancedBufferAttribute(new Float32Array(members.length * 4), 4);
+        agentAttr.setUsage(THREE.DynamicDrawUsage);
+        geometry.setAttribute('aAgent', agentAttr);
+        geometry.instanceCount = members.length;
+
+        const mesh = new THREE.Mesh(geometry, material);
+        mesh.frustumCulled = false; // Instances span the whole city
+        scene.add(mesh);
+        batches.push(agentAttr);
+
+        members.forEach((i, slot) => {
+            const a = data.agents.slice(i * stride, (i + 1) * stride);
+            const path = paths[a[field.path]];
+            // Keep the sideways stagger the generator gave each agent
+            const px = a[field.x] - (path.x0 + path.dx * a[field.distance]);
+            const pz = a[field.z] - (path.z0 + path.dz * a[field.distance]);
+            agents.push({
+                path,
+                distance: a[field.distance],
+                speed: a[field.speed],
+                lateral: px * path.nx + pz * path.nz,
+                phase: a[field.phase],
+                array: agentAttr.array,
+                offset: slot * 4
+            });
+        });
+    });
+
+    function update(delta, time) {
+        material.uniforms.uTime.value = time;
+
+        for (const agent of agents) {
+            const { path, array, offset } = agent;
+            agent.distance = (agent.distance + agent.speed * delta) % path.length;
+            if (agent.distance < 0) agent.distance += path.length;
+
+            array[offset] = path.x0 + path.dx * agent.distance + path.nx * agent.lateral;
+            array[offset + 1] = path.z0 + path.dz * agent.distance + path.nz * agent.lateral;
+            array[offset + 2] = agent.speed < 0 ? path.heading + Math.PI : path.heading;
+            array[offset + 3] = agent.phase;
+        }
+        for (const attr of batches) attr.needsUpdate = true;
+    }
+
+    console.log(`✓ Crowd loaded: ${count} pedestrians, ${batches.length} palettes`);
+    return { count, update };
+}
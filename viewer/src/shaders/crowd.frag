@@ -0,0 +1,14 @@
+// Crowd Fragment Shader
+// Flat shading from screen-space derivatives (prototypes carry no normals)
+
+precision highp float;
+
+varying vec3 vPosition;
+varying vec3 vColor;
+
+void main() {
+    vec3 normal = normalize(cross(dFdx(vPosition), dFdy(vPosition)));
+    float light = 0.45 + 0.55 * max(dot(normal, normalize(vec3(0.3, 1.0, 0.5))), 0.0);
+
+    gl_FragColor = vec4(vColor * light, 1.0);
+}
@@ -0,0 +1,45 @@
+// Crowd Vertex Shader
+// Instanced pedestrians: walk cycle by swinging limbs around shoulder/hip,
+// then rotate to the agent heading and move to its position.
+
+precision highp float;
+
+attribute float limb;   // 0 body, 1 left arm, 2 right arm, 3 left leg, 4 right leg
+attribute vec4 aAgent;  // x, z, heading, walk phase
+
+uniform float uTime;
+uniform float uCadence;
+uniform float uSwing;
+
+varying vec3 vPosition;
+varying vec3 vColor;
+
+void main() {
+    vec3 p = position;
+
+    if (limb > 0.5) {
+        float isLeg = step(2.5, limb);
+        // Left arm and right leg move together, opposite the other pair
+        float side = (abs(limb - 1.0) < 0.5 || abs(limb - 4.0) < 0.5) ? 1.0 : -1.0;
+        float angle = sin(uTime * uCadence + aAgent.w) * uSwing * side * mix(0.7, 1.0, isLeg);
+        float pivotY = mix(1.4, 0.8, isLeg);
+
+        float c = cos(angle);
+        float s = sin(angle);
+        float y = p.y - pivotY;
+        p.y = pivotY + y * c - p.z * s;
+        p.z = y * s + p.z * c;
+    }
+
+    // Heading rotates the prototype's +z facing around Y
+    float ch = cos(aAgent.z);
+    float sh = sin(aAgent.z);
+    vec3 worldPos = vec3(p.x * ch + p.z * sh, p.y, -p.x * sh + p.z * ch);
+    worldPos += vec3(aAgent.x, 0.0, aAgent.y);
+
+    vec4 mvPosition = modelViewMatrix * vec4(worldPos, 1.0);
+    vPosition = mvPosition.xyz;
+    vColor = color;
+
+    gl_Position = projectionMatrix * mvPosition;
+}
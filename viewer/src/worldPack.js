@@ -0,0 +1,104 @@
+// =============================================================================
+// WORLD PACK (.pfxw) READER
+// Mirrors generator/world_pack.py. All values are little-endian and every
+// section starts on a 16-byte boundary, so typed arrays can view the
+// downloaded buffer directly without copying.
+// =============================================================================
+const MAGIC = 'PFXW';
+const VERSION = 1;
+const HEADER_SIZE = 64;
+const RECORD_SIZE = 80;
+
+function readHeader(view) {
+    const magic = String.fromCharCode(
+        view.getUint8(0), view.getUint8(1), view.getUint8(2), view.getUint8(3)
+    );
+    if (magic !== MAGIC) throw new Error('Not a world pack');
+
+    const version = view.getUint32(4, true);
+    if (version !== VERSION) throw new Error(`Unsupported world pack version ${version}`);
+
+    const offset = (byte) => Number(view.getBigUint64(byte, true));
+    return {
+        objectCount: view.getUint32(8, true),
+        vertexCount: view.getUint32(12, true),
+        indexCount: view.getUint32(16, true),
+        namesSize: view.getUint32(20, true),
+        namesOffset: offset(24),
+        tableOffset: offset(32),
+        vertexOffset: offset(40),
+        colorOffset: offset(48),
+        indexOffset: offset(56)
+    };
+}
+
+function readTable(view, header, base) {
+    const namesStart = header.namesOffset - base;
+    const names = new TextDecoder()
+        .decode(new Uint8Array(view.buffer, view.byteOffset + namesStart, header.namesSize))
+        .split('\0');
+
+    const objects = [];
+    for (let i = 0; i < header.objectCount; i++) {
+        const at = header.tableOffset - base + i * RECORD_SIZE;
+        const f32 = (k) => view.getFloat32(at + 8 + k * 4, true);
+        const u64 = (k) => Number(view.getBigUint64(at + 32 + k * 8, true));
+        const seed = view.getInt32(at + 4, true);
+        objects.push({
+            type: names[view.getUint32(at, true)],
+            seed: seed === -1 ? null : seed,
+            min: [f32(0), f32(1), f32(2)],
+            max: [f32(3), f32(4), f32(5)],
+            vertices: [u64(0), u64(1)],
+            colors: [u64(2), u64(3)],
+            indices: [u64(4), u64(5)]
+        });
+    }
+    return objects;
+}
+
+// Parse a fully downloaded pack. Section arrays are views into `buffer`.
+export function parseWorldPack(buffer) {
+    const view = new DataView(buffer);
+    const header = readHeader(view);
+    return {
+        header,
+        objects: readTable(view, header, 0),
+        vertices: new Float32Array(buffer, header.vertexOffset, header.vertexCount * 3),
+        colors: new Float32Array(buffer, header.colorOffset, header.vertexCount * 3),
+        indices: new Uint32Array(buffer, header.indexOffset, header.indexCount)
+    };
+}
+
+async function fetchRange(url, [offset, size]) {
+    const response = await fetch(url, {
+        headers: { Range: `bytes=${offset}-${offset + size - 1}` }
+    });
+    if (response.status !== 206) throw new Error(`Range requests not supported for ${url}`);
+    return response.arrayBuffer();
+}
+
+// Fetch only the header and object table of a pack.
+export async function fetchWorldPackTable(url) {
+    const header = readHeader(new DataView(await fetchRange(url, [0, HEADER_SIZE])));
+    const start = header.namesOffset;
+    const end = header.tableOffset + header.objectCount * RECORD_SIZE;
+    const view = new DataView(await fetchRange(url, [start, end - start]));
+    return { header, objects: readTable(view, header, start) };
+}
+
+// Fetch the geometry of a single object from its table entry.
+// Indices stay world-wide; subtract `vertexStart` to index into `vertices`.
+export async function fetchWorldObject(url, header, entry) {
+    const [vertices, colors, indices] = await Promise.all([
+        fetchRange(url, entry.vertices),
+        fetchRange(url, entry.colors),
+        fetchRange(url, entry.indices)
+    ]);
+    return {
+        vertices: new Float32Array(vertices),
+        colors: new Float32Array(colors),
+        indices: new Uint32Array(indices),
+        vertexStart: (entry.vertices[0] - header.vertexOffset) / 12
+    };
+}